@@ -5,10 +5,13 @@ Creates icons in all required iOS sizes
 """
 
 from PIL import Image, ImageDraw, ImageFont
+import functools
+import io
 import os
+import shutil
 
 # Icon sizes needed for iOS
-ICON_SIZES = [
+ICON_SIZES = (
     (20, "@1x"), (40, "@2x"), (60, "@3x"),  # 20x20
     (29, "@1x"), (58, "@2x"), (87, "@3x"),  # 29x29
     (40, "@1x"), (80, "@2x"), (120, "@3x"), # 40x40
@@ -16,34 +19,155 @@ ICON_SIZES = [
     (76, "@1x"), (152, "@2x"),              # 76x76
     (167, "@2x"),                           # 83.5x83.5
     (1024, "@1x")                           # 1024x1024
+)
+
+# Distinct pixel sizes, in ICON_SIZES order; each is rendered once
+UNIQUE_SIZES = tuple(dict.fromkeys(size for size, _ in ICON_SIZES))
+
+# Output filename for each (size, scale) in ICON_SIZES
+NAME_TABLE = {
+    (20, "@1x"): "Icon-App-20x20@1x.png",
+    (40, "@2x"): "Icon-App-20x20@2x.png",
+    (60, "@3x"): "Icon-App-20x20@3x.png",
+    (29, "@1x"): "Icon-App-29x29@1x.png",
+    (58, "@2x"): "Icon-App-29x29@2x.png",
+    (87, "@3x"): "Icon-App-29x29@3x.png",
+    (40, "@1x"): "Icon-App-40x40@1x.png",
+    (80, "@2x"): "Icon-App-40x40@2x.png",
+    (120, "@3x"): "Icon-App-40x40@3x.png",
+    (120, "@2x"): "Icon-App-60x60@2x.png",
+    (180, "@3x"): "Icon-App-60x60@3x.png",
+    (76, "@1x"): "Icon-App-76x76@1x.png",
+    (152, "@2x"): "Icon-App-76x76@2x.png",
+    (167, "@2x"): "Icon-App-83.5x83.5@2x.png",
+    (1024, "@1x"): "Icon-App-1024x1024@1x.png",
+}
+
+# Every color the blocks use; shapes are drawn in 'P' mode against this
+# palette so each fill stores one byte per pixel instead of three
+PALETTE = [
+    (0xFF, 0xFF, 0xFF),
+    (0x1E, 0x88, 0xE5),
+    (0xFF, 0x70, 0x43),
+    (0x66, 0xBB, 0x6A),
+    (0x42, 0x42, 0x42),
 ]
+PALETTE_DATA = [channel for color in PALETTE for channel in color]
+
+# Below this size a 10x10 grid can't be resolved; icons are flat blocks
+SIMPLIFIED_SIZE = 40
+
+@functools.lru_cache(maxsize=None)
+def render_block_grid(rows, cols, cell_width, cell_height, fill, outline):
+    """Render a rows x cols grid of bordered cells as a single image"""
+    
+    # Each cell carries its own 1px outline, like draw.rectangle(width=1).
+    # Every pixel row is a border row or the same run of bordered cells, so
+    # one cell's rows are built as palette-index bytes and tiled.
+    fill_byte = bytes([PALETTE.index(fill)])
+    border_byte = bytes([PALETTE.index(outline)])
+    width = cols * cell_width
+    if cell_width > 2:
+        cell_row = (border_byte + fill_byte * (cell_width - 2) + border_byte) * cols
+    else:
+        cell_row = border_byte * width
+    border_row = border_byte * width
+    if cell_height > 2:
+        cell_rows = border_row + cell_row * (cell_height - 2) + border_row
+    else:
+        cell_rows = border_row * cell_height
+    
+    grid = Image.frombytes('P', (width, rows * cell_height), cell_rows * rows)
+    grid.putpalette(PALETTE_DATA)
+    return grid
+
+@functools.lru_cache(maxsize=64)
+def load_font(path, size):
+    """Load a TrueType font once per path and size, or None if unavailable"""
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return None
+
+@functools.lru_cache(maxsize=64)
+def render_label(text, font, anchor=None):
+    """Rasterize a label once; returns its coverage mask and bbox around the anchor"""
+    bbox = ImageDraw.Draw(Image.new('L', (1, 1))).textbbox((0, 0), text, font=font, anchor=anchor)
+    mask = Image.new('L', (bbox[2] - bbox[0], bbox[3] - bbox[1]), 0)
+    ImageDraw.Draw(mask).text((-bbox[0], -bbox[1]), text, fill=255, font=font, anchor=anchor)
+    return mask, bbox
+
+@functools.lru_cache(maxsize=None)
+def render_border_mask(size, inset, radius, width):
+    """Draw the rounded icon border at 2x and reduce it to an antialiased mask"""
+    mask = Image.new('L', (size * 2, size * 2), 0)
+    far = 2 * (size - inset) - 1
+    ImageDraw.Draw(mask).rounded_rectangle([2 * inset, 2 * inset, far, far],
+                                           radius=2 * radius, outline=255, width=2 * width)
+    return mask.reduce(2)
+
+def render_simplified_icon(size):
+    """Draw a tiny icon as three flat blocks, too small for cells or labels"""
+    
+    img = Image.new('RGB', (size, size), (0xFF, 0xFF, 0xFF))
+    draw = ImageDraw.Draw(img)
+    
+    # Same layout as create_bond_to_ten_icon, without its size cut-offs
+    margin = max(2, size // 20)
+    content_area = size - 2 * margin
+    block_spacing = max(2, content_area // 20)
+    
+    # Hundred square (top)
+    hundred_size = content_area // 3
+    hundred_x = margin + (content_area - hundred_size) // 2
+    draw.rectangle([hundred_x, margin, hundred_x + hundred_size - 1, margin + hundred_size - 1],
+                   fill=(0x1E, 0x88, 0xE5))
+    
+    # Ten strip (middle)
+    ten_y = margin + hundred_size + block_spacing
+    ten_width = min(content_area * 3 // 4, hundred_size)
+    ten_height = max(2, content_area // 15)
+    ten_x = margin + (content_area - ten_width) // 2
+    draw.rectangle([ten_x, ten_y, ten_x + ten_width - 1, ten_y + ten_height],
+                   fill=(0xFF, 0x70, 0x43))
+    
+    # Unit square (bottom)
+    unit_y = ten_y + ten_height + block_spacing
+    unit_size = max(4, min(content_area // 8, hundred_size // 4))
+    unit_x = margin + (content_area - unit_size) // 2
+    draw.rectangle([unit_x, unit_y, unit_x + unit_size, unit_y + unit_size],
+                   fill=(0x66, 0xBB, 0x6A))
+    
+    return img
 
 def create_bond_to_ten_icon(size):
     """Create Bond to Ten icon with proper mathematical base-10 blocks"""
     
-    # Create image with white background
-    img = Image.new('RGB', (size, size), '#FFFFFF')
+    if size < SIMPLIFIED_SIZE:
+        return render_simplified_icon(size)
+    
+    # Create palette image with white background
+    img = Image.new('P', (size, size), PALETTE.index((0xFF, 0xFF, 0xFF)))
+    img.putpalette(PALETTE_DATA)
     draw = ImageDraw.Draw(img)
+    labels = []
     
     # Calculate proportional sizes
     margin = max(2, size // 20)
     content_area = size - 2 * margin
     
     # Educational colors for math blocks
-    hundred_color = '#1E88E5'    # Blue for hundreds
-    ten_color = '#FF7043'        # Orange for tens  
-    unit_color = '#66BB6A'       # Green for units
-    text_color = '#263238'       # Dark gray for text
-    border_color = '#424242'     # Medium gray for borders
+    hundred_color = (0x1E, 0x88, 0xE5)  # Blue for hundreds
+    ten_color = (0xFF, 0x70, 0x43)      # Orange for tens  
+    unit_color = (0x66, 0xBB, 0x6A)     # Green for units
+    text_color = (0x26, 0x32, 0x38)     # Dark gray for text
+    border_color = (0x42, 0x42, 0x42)   # Medium gray for borders
     
     # Font setup
-    try:
-        if size >= 100:
-            font_size = max(8, size // 25)
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica-Bold.ttc", font_size)
-        else:
-            font = None
-    except:
+    if size >= 100:
+        font_size = max(8, size // 25)
+        font = load_font("/System/Library/Fonts/Helvetica-Bold.ttc", font_size)
+    else:
         font = None
     
     # Layout: Arrange blocks vertically for clarity
@@ -58,24 +182,18 @@ def create_bond_to_ten_icon(size):
         cell_size = max(1, hundred_size // 10)
         
         # Draw the 10x10 grid
-        for row in range(10):
-            for col in range(10):
-                if cell_size >= 1:
-                    x1 = hundred_x + col * cell_size
-                    y1 = hundred_y + row * cell_size
-                    x2 = x1 + cell_size - 1
-                    y2 = y1 + cell_size - 1
-                    
-                    if x2 > x1 and y2 > y1:
-                        draw.rectangle([x1, y1, x2, y2], 
-                                     fill=hundred_color, 
-                                     outline=border_color,
-                                     width=1 if size >= 60 else 0)
+        if cell_size > 1 and size >= 60:
+            grid = render_block_grid(10, 10, cell_size, cell_size, hundred_color, border_color)
+            img.paste(grid, (hundred_x, hundred_y))
+        elif cell_size > 1:
+            # Small icons have no cell outlines, so the grid is one solid fill
+            draw.rectangle([hundred_x, hundred_y,
+                            hundred_x + 10 * cell_size - 1, hundred_y + 10 * cell_size - 1],
+                           fill=hundred_color)
         
         # Add "100" label below
         if font and size >= 60:
-            draw.text((hundred_x + hundred_size//2 - 10, hundred_y + hundred_size + 2), 
-                     "100", fill=text_color, font=font, anchor="mt")
+            labels.append(((hundred_x + hundred_size//2 - 10, hundred_y + hundred_size + 2), "100"))
     
     # 2. Draw ten strip (middle) - 10 connected rectangles
     ten_y = hundred_y + hundred_size + block_spacing
@@ -86,23 +204,17 @@ def create_bond_to_ten_icon(size):
     if ten_width > 10 and ten_height > 0:
         unit_width = max(1, ten_width // 10)
         
-        for i in range(10):
-            if unit_width >= 1:
-                x1 = ten_x + i * unit_width
-                y1 = ten_y
-                x2 = x1 + unit_width - 1
-                y2 = y1 + ten_height
-                
-                if x2 > x1 and y2 > y1:
-                    draw.rectangle([x1, y1, x2, y2], 
-                                 fill=ten_color, 
-                                 outline=border_color,
-                                 width=1 if size >= 60 else 0)
+        if unit_width > 1 and size >= 60:
+            strip = render_block_grid(1, 10, unit_width, ten_height + 1, ten_color, border_color)
+            img.paste(strip, (ten_x, ten_y))
+        elif unit_width > 1:
+            # Without outlines the ten units merge into one solid strip
+            draw.rectangle([ten_x, ten_y, ten_x + 10 * unit_width - 1, ten_y + ten_height],
+                           fill=ten_color)
         
         # Add "10" label below
         if font and size >= 60:
-            draw.text((ten_x + ten_width//2, ten_y + ten_height + 2), 
-                     "10", fill=text_color, font=font, anchor="mt")
+            labels.append(((ten_x + ten_width//2, ten_y + ten_height + 2), "10"))
     
     # 3. Draw unit cube (bottom) - single square
     unit_y = ten_y + ten_height + block_spacing
@@ -117,19 +229,45 @@ def create_bond_to_ten_icon(size):
         
         # Add "1" label below
         if font and size >= 60:
-            draw.text((unit_x + unit_size//2, unit_y + unit_size + 2), 
-                     "1", fill=text_color, font=font, anchor="mt")
+            labels.append(((unit_x + unit_size//2, unit_y + unit_size + 2), "1"))
+    
+    # The border and labels go on after converting, as 'P' mode can't
+    # antialias them
+    img = img.convert('RGB')
     
     # Add subtle rounded border for larger icons
     if size >= 120:
         border_radius = size // 25
-        draw.rounded_rectangle([1, 1, size-2, size-2], 
-                              radius=border_radius,
-                              outline='#E0E0E0', 
-                              width=1)
+        img.paste((0xE0, 0xE0, 0xE0), (0, 0), render_border_mask(size, 1, border_radius, 1))
+    
+    for (x, y), text in labels:
+        mask, bbox = render_label(text, font, "mt")
+        img.paste(text_color, (x + bbox[0], y + bbox[1]), mask)
     
     return img
 
+def render_png(size):
+    """Draw the icon at size and return it encoded as PNG"""
+    
+    # Drawing a size directly is cheaper than downscaling a larger render
+    icon = create_bond_to_ten_icon(size)
+    
+    # Fast zlib level for small icons, where the byte savings are negligible;
+    # the App Store master keeps the default level
+    buf = io.BytesIO()
+    icon.save(buf, "PNG", optimize=False, compress_level=1 if size < 256 else 6)
+    return buf.getvalue()
+
+def link_icon(primary_path, filepath):
+    """Point filepath at an already written icon of the same size"""
+    if os.path.exists(filepath):
+        os.remove(filepath)
+    try:
+        os.link(primary_path, filepath)
+    except OSError:
+        # Filesystems without hard link support get a plain copy
+        shutil.copyfile(primary_path, filepath)
+
 def generate_ios_icons():
     """Generate all iOS icon sizes"""
     
@@ -139,46 +277,21 @@ def generate_ios_icons():
     
     print("Generating proper Bond to Ten app icons...")
     
-    # Generate icons for each size
-    for size_info in ICON_SIZES:
-        if len(size_info) == 2:
-            size, scale = size_info
-            # Calculate base size from scale
-            if scale == "@2x":
-                base_size = size // 2
-            elif scale == "@3x":
-                base_size = size // 3
-            else:
-                base_size = size
-        else:
-            size = size_info[0]
-            scale = "@1x"
-            base_size = size
-        
-        # Create icon
-        icon = create_bond_to_ten_icon(size)
-        
-        # Determine filename based on base size
-        if size == 1024:
-            filename = "Icon-App-1024x1024@1x.png"
-        elif base_size == 20:
-            filename = f"Icon-App-20x20{scale}.png"
-        elif base_size == 29:
-            filename = f"Icon-App-29x29{scale}.png"
-        elif base_size == 40:
-            filename = f"Icon-App-40x40{scale}.png"
-        elif base_size == 60:
-            filename = f"Icon-App-60x60{scale}.png"
-        elif base_size == 76:
-            filename = f"Icon-App-76x76{scale}.png"
-        elif size == 167:
-            filename = "Icon-App-83.5x83.5@2x.png"
-        else:
-            filename = f"Icon-App-{size}x{size}.png"
-        
-        # Save icon
+    icons = [(size, NAME_TABLE[(size, scale)]) for size, scale in ICON_SIZES]
+    
+    # Several icons share a pixel size (e.g. 40px, 120px); encode each size once
+    encoded = {size: render_png(size) for size in UNIQUE_SIZES}
+    
+    # The first icon of each size is written out, the rest hard link to it
+    primary_paths = {}
+    for size, filename in icons:
         filepath = os.path.join(icon_dir, filename)
-        icon.save(filepath, "PNG")
+        if size in primary_paths:
+            link_icon(primary_paths[size], filepath)
+        else:
+            with open(filepath, "wb") as f:
+                f.write(encoded[size])
+            primary_paths[size] = filepath
         print(f"✅ Generated: {filename} ({size}x{size})")
 
 if __name__ == "__main__":
@@ -5,10 +5,13 @@ Creates icons in all required iOS sizes
 """
 
 from PIL import Image, ImageDraw, ImageFont
+import functools
+import io
 import os
+import shutil
 
 # Icon sizes needed for iOS
-ICON_SIZES = [
+ICON_SIZES = (
     (20, "@1x"), (40, "@2x"), (60, "@3x"),  # 20x20
     (29, "@1x"), (58, "@2x"), (87, "@3x"),  # 29x29
     (40, "@1x"), (80, "@2x"), (120, "@3x"), # 40x40
@@ -16,34 +19,161 @@ ICON_SIZES = [
     (76, "@1x"), (152, "@2x"),              # 76x76
     (167, "@2x"),                           # 83.5x83.5
     (1024, "@1x")                           # 1024x1024
+)
+
+# Distinct pixel sizes, in ICON_SIZES order; each is rendered once
+UNIQUE_SIZES = tuple(dict.fromkeys(size for size, _ in ICON_SIZES))
+
+# Output filename for each (size, scale) in ICON_SIZES
+NAME_TABLE = {
+    (20, "@1x"): "Icon-App-20x20@1x.png",
+    (40, "@2x"): "Icon-App-20x20@2x.png",
+    (60, "@3x"): "Icon-App-20x20@3x.png",
+    (29, "@1x"): "Icon-App-29x29@1x.png",
+    (58, "@2x"): "Icon-App-29x29@2x.png",
+    (87, "@3x"): "Icon-App-29x29@3x.png",
+    (40, "@1x"): "Icon-App-40x40@1x.png",
+    (80, "@2x"): "Icon-App-40x40@2x.png",
+    (120, "@3x"): "Icon-App-40x40@3x.png",
+    (120, "@2x"): "Icon-App-60x60@2x.png",
+    (180, "@3x"): "Icon-App-60x60@3x.png",
+    (76, "@1x"): "Icon-App-76x76@1x.png",
+    (152, "@2x"): "Icon-App-76x76@2x.png",
+    (167, "@2x"): "Icon-App-83.5x83.5@2x.png",
+    (1024, "@1x"): "Icon-App-1024x1024@1x.png",
+}
+
+# Every color the blocks use; shapes are drawn in 'P' mode against this
+# palette so each fill stores one byte per pixel instead of three
+PALETTE = [
+    (0xFF, 0xFF, 0xFF),
+    (0x21, 0x96, 0xF3),
+    (0xFF, 0x98, 0x00),
+    (0x4C, 0xAF, 0x50),
+    (0x33, 0x33, 0x33),
 ]
+PALETTE_DATA = [channel for color in PALETTE for channel in color]
+
+# Below this size a 10x10 grid can't be resolved; icons are flat blocks
+SIMPLIFIED_SIZE = 40
+
+@functools.lru_cache(maxsize=None)
+def render_block_grid(rows, cols, cell_width, cell_height, fill, outline):
+    """Render a rows x cols grid of bordered cells as a single image"""
+    
+    # Each cell carries its own 1px outline, like draw.rectangle(width=1).
+    # Every pixel row is a border row or the same run of bordered cells, so
+    # one cell's rows are built as palette-index bytes and tiled.
+    fill_byte = bytes([PALETTE.index(fill)])
+    border_byte = bytes([PALETTE.index(outline)])
+    width = cols * cell_width
+    if cell_width > 2:
+        cell_row = (border_byte + fill_byte * (cell_width - 2) + border_byte) * cols
+    else:
+        cell_row = border_byte * width
+    border_row = border_byte * width
+    if cell_height > 2:
+        cell_rows = border_row + cell_row * (cell_height - 2) + border_row
+    else:
+        cell_rows = border_row * cell_height
+    
+    grid = Image.frombytes('P', (width, rows * cell_height), cell_rows * rows)
+    grid.putpalette(PALETTE_DATA)
+    return grid
+
+@functools.lru_cache(maxsize=64)
+def load_font(path, size):
+    """Load a TrueType font once per path and size, or None if unavailable"""
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return None
+
+@functools.lru_cache(maxsize=None)
+def load_default_font():
+    """Load PIL's built-in font once"""
+    return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=64)
+def render_label(text, font, anchor=None):
+    """Rasterize a label once; returns its coverage mask and bbox around the anchor"""
+    bbox = ImageDraw.Draw(Image.new('L', (1, 1))).textbbox((0, 0), text, font=font, anchor=anchor)
+    mask = Image.new('L', (bbox[2] - bbox[0], bbox[3] - bbox[1]), 0)
+    ImageDraw.Draw(mask).text((-bbox[0], -bbox[1]), text, fill=255, font=font, anchor=anchor)
+    return mask, bbox
+
+@functools.lru_cache(maxsize=None)
+def render_border_mask(size, inset, radius, width):
+    """Draw the rounded icon border at 2x and reduce it to an antialiased mask"""
+    mask = Image.new('L', (size * 2, size * 2), 0)
+    far = 2 * (size - inset) - 1
+    ImageDraw.Draw(mask).rounded_rectangle([2 * inset, 2 * inset, far, far],
+                                           radius=2 * radius, outline=255, width=2 * width)
+    return mask.reduce(2)
+
+def render_simplified_icon(size):
+    """Draw a tiny icon as three flat blocks, too small for cells or labels"""
+    
+    img = Image.new('RGB', (size, size), (0xFF, 0xFF, 0xFF))
+    draw = ImageDraw.Draw(img)
+    
+    # Same layout as create_bond_to_ten_icon
+    margin = size // 12
+    content_size = size - 2 * margin
+    
+    # Hundred square (top area)
+    hundred_size = content_size // 3
+    hundred_x = margin + (content_size - hundred_size) // 2
+    draw.rectangle([hundred_x, margin, hundred_x + hundred_size - 1, margin + hundred_size - 1],
+                   fill=(0x21, 0x96, 0xF3))
+    
+    # Ten strip (middle left)
+    ten_width = content_size // 2
+    ten_height = content_size // 12
+    ten_y = margin + hundred_size + margin
+    draw.rectangle([margin, ten_y, margin + ten_width - 1, ten_y + ten_height],
+                   fill=(0xFF, 0x98, 0x00))
+    
+    # Single unit (bottom right)
+    unit_size = content_size // 8
+    unit_x = margin + content_size - unit_size
+    unit_y = ten_y + ten_height + margin // 2
+    draw.rectangle([unit_x, unit_y, unit_x + unit_size, unit_y + unit_size],
+                   fill=(0x4C, 0xAF, 0x50))
+    
+    return img
 
 def create_bond_to_ten_icon(size):
     """Create Bond to Ten icon with proper base-10 blocks representation"""
     
-    # Create image with white background (typical for educational apps)
-    img = Image.new('RGB', (size, size), '#FFFFFF')
+    if size < SIMPLIFIED_SIZE:
+        return render_simplified_icon(size)
+    
+    # Create palette image with white background (typical for educational apps)
+    img = Image.new('P', (size, size), PALETTE.index((0xFF, 0xFF, 0xFF)))
+    img.putpalette(PALETTE_DATA)
     draw = ImageDraw.Draw(img)
+    # Labels as (text, left, width, top), centered within width once drawn
+    labels = []
     
     # Calculate sizes based on icon size
     margin = size // 12
     content_size = size - 2 * margin
     
     # Colors for different base-10 blocks
-    unit_color = '#4CAF50'      # Green for units (1s)
-    ten_color = '#FF9800'       # Orange for tens  
-    hundred_color = '#2196F3'   # Blue for hundreds
-    border_color = '#333333'    # Dark border
+    unit_color = (0x4C, 0xAF, 0x50)     # Green for units (1s)
+    ten_color = (0xFF, 0x98, 0x00)      # Orange for tens  
+    hundred_color = (0x21, 0x96, 0xF3)  # Blue for hundreds
+    border_color = (0x33, 0x33, 0x33)   # Dark border
     
     # Font setup
-    try:
-        font_size = max(size // 20, 8)
-        font = ImageFont.truetype("/System/Library/Fonts/Helvetica-Bold.ttc", font_size)
-        title_font_size = max(size // 25, 6)
-        title_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", title_font_size)
-    except:
+    font_size = max(size // 20, 8)
+    font = load_font("/System/Library/Fonts/Helvetica-Bold.ttc", font_size)
+    title_font_size = max(size // 25, 6)
+    title_font = load_font("/System/Library/Fonts/Helvetica.ttc", title_font_size)
+    if font is None or title_font is None:
         try:
-            font = ImageFont.load_default()
+            font = load_default_font()
             title_font = font
         except:
             font = None
@@ -58,30 +188,13 @@ def create_bond_to_ten_icon(size):
     
     # Create hundred square as a 10x10 grid
     cell_size = max(1, hundred_size // 10)
-    for row in range(10):
-        for col in range(10):
-            cell_x = hundred_x + col * cell_size
-            cell_y = hundred_y + row * cell_size
-            cell_x2 = cell_x + cell_size - 1
-            cell_y2 = cell_y + cell_size - 1
-            # Ensure coordinates are valid
-            if cell_x2 > cell_x and cell_y2 > cell_y:
-                draw.rectangle(
-                    [cell_x, cell_y, cell_x2, cell_y2],
-                    fill=hundred_color,
-                    outline=border_color,
-                    width=1
-                )
+    # Ensure cells are large enough to draw
+    if cell_size > 1:
+        grid = render_block_grid(10, 10, cell_size, cell_size, hundred_color, border_color)
+        img.paste(grid, (hundred_x, hundred_y))
     
     # Add "100" label
-    if font:
-        text = "100"
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        text_x = hundred_x + (hundred_size - text_width) // 2
-        text_y = hundred_y + hundred_size + 2
-        draw.text((text_x, text_y), text, fill=border_color, font=font)
+    labels.append(("100", hundred_x, hundred_size, hundred_y + hundred_size + 2))
     
     # 2. Draw ten strip (middle left)
     ten_width = content_size // 2
@@ -91,27 +204,13 @@ def create_bond_to_ten_icon(size):
     
     # Create ten strip as 10 connected units
     unit_width = max(1, ten_width // 10)
-    for i in range(10):
-        unit_x = ten_x + i * unit_width
-        unit_x2 = unit_x + unit_width - 1
-        unit_y2 = ten_y + ten_height
-        # Ensure coordinates are valid
-        if unit_x2 > unit_x and unit_y2 > ten_y:
-            draw.rectangle(
-                [unit_x, ten_y, unit_x2, unit_y2],
-                fill=ten_color,
-                outline=border_color,
-                width=1
-            )
+    # Ensure units are large enough to draw
+    if unit_width > 1 and ten_height > 0:
+        strip = render_block_grid(1, 10, unit_width, ten_height + 1, ten_color, border_color)
+        img.paste(strip, (ten_x, ten_y))
     
     # Add "10" label
-    if font:
-        text = "10"
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_x = ten_x + (ten_width - text_width) // 2
-        text_y = ten_y + ten_height + 2
-        draw.text((text_x, text_y), text, fill=border_color, font=font)
+    labels.append(("10", ten_x, ten_width, ten_y + ten_height + 2))
     
     # 3. Draw single unit (bottom right)
     unit_size = content_size // 8
@@ -126,28 +225,48 @@ def create_bond_to_ten_icon(size):
     )
     
     # Add "1" label
-    if font:
-        text = "1"
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_x = unit_x + (unit_size - text_width) // 2
-        text_y = unit_y + unit_size + 2
-        draw.text((text_x, text_y), text, fill=border_color, font=font)
+    labels.append(("1", unit_x, unit_size, unit_y + unit_size + 2))
+    
+    # The border and labels go on after converting, as 'P' mode can't
+    # antialias them
+    img = img.convert('RGB')
     
     # Add rounded corner border for the whole icon (optional)
     if size >= 100:
         border_radius = size // 20
         # Draw a subtle border around the entire icon
-        draw.rounded_rectangle(
-            [2, 2, size-3, size-3],
-            radius=border_radius,
-            fill=None,
-            outline='#E0E0E0',
-            width=2
-        )
+        img.paste((0xE0, 0xE0, 0xE0), (0, 0), render_border_mask(size, 2, border_radius, 2))
+    
+    if font:
+        for text, left, width, top in labels:
+            mask, bbox = render_label(text, font)
+            text_x = left + (width - (bbox[2] - bbox[0])) // 2
+            img.paste(border_color, (text_x + bbox[0], top + bbox[1]), mask)
     
     return img
 
+def render_png(size):
+    """Draw the icon at size and return it encoded as PNG"""
+    
+    # Drawing a size directly is cheaper than downscaling a larger render
+    icon = create_bond_to_ten_icon(size)
+    
+    # Fast zlib level for small icons, where the byte savings are negligible;
+    # the App Store master keeps the default level
+    buf = io.BytesIO()
+    icon.save(buf, "PNG", optimize=False, compress_level=1 if size < 256 else 6)
+    return buf.getvalue()
+
+def link_icon(primary_path, filepath):
+    """Point filepath at an already written icon of the same size"""
+    if os.path.exists(filepath):
+        os.remove(filepath)
+    try:
+        os.link(primary_path, filepath)
+    except OSError:
+        # Filesystems without hard link support get a plain copy
+        shutil.copyfile(primary_path, filepath)
+
 def generate_ios_icons():
     """Generate all iOS icon sizes"""
     
@@ -155,44 +274,21 @@ def generate_ios_icons():
     icon_dir = "ios/Runner/Assets.xcassets/AppIcon.appiconset"
     os.makedirs(icon_dir, exist_ok=True)
     
-    # Generate icons for each size
-    for size_info in ICON_SIZES:
-        if len(size_info) == 2:
-            size, scale = size_info
-            base_size = {
-                "@1x": size,
-                "@2x": size // 2,
-                "@3x": size // 3
-            }.get(scale, size)
-        else:
-            size = size_info[0]
-            scale = "@1x"
-            base_size = size
-        
-        # Create icon
-        icon = create_bond_to_ten_icon(size)
-        
-        # Determine filename based on size
-        if size == 1024:
-            filename = "Icon-App-1024x1024@1x.png"
-        elif base_size == 20:
-            filename = f"Icon-App-20x20{scale}.png"
-        elif base_size == 29:
-            filename = f"Icon-App-29x29{scale}.png"
-        elif base_size == 40:
-            filename = f"Icon-App-40x40{scale}.png"
-        elif base_size == 60:
-            filename = f"Icon-App-60x60{scale}.png"
-        elif base_size == 76:
-            filename = f"Icon-App-76x76{scale}.png"
-        elif size == 167:
-            filename = "Icon-App-83.5x83.5@2x.png"
-        else:
-            filename = f"Icon-App-{size}x{size}.png"
-        
-        # Save icon
+    icons = [(size, NAME_TABLE[(size, scale)]) for size, scale in ICON_SIZES]
+    
+    # Several icons share a pixel size (e.g. 40px, 120px); encode each size once
+    encoded = {size: render_png(size) for size in UNIQUE_SIZES}
+    
+    # The first icon of each size is written out, the rest hard link to it
+    primary_paths = {}
+    for size, filename in icons:
         filepath = os.path.join(icon_dir, filename)
-        icon.save(filepath, "PNG")
+        if size in primary_paths:
+            link_icon(primary_paths[size], filepath)
+        else:
+            with open(filepath, "wb") as f:
+                f.write(encoded[size])
+            primary_paths[size] = filepath
         print(f"Generated: {filename} ({size}x{size})")
 
 if __name__ == "__main__":
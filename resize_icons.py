@@ -4,10 +4,14 @@ Resize Bond to Ten icons to all required iOS sizes
 """
 
 from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import io
 import os
+import shutil
 
 # Define the target sizes based on iOS requirements
-ICON_SIZES = [
+ICON_SIZES = (
     # iPhone
     (40, "Icon-App-20x20@2x.png"),     # 20x20@2x
     (60, "Icon-App-20x20@3x.png"),     # 20x20@3x  
@@ -24,23 +28,60 @@ ICON_SIZES = [
     
     # App Store
     (1024, "Icon-App-1024x1024@1x.png"), # 1024x1024@1x
-]
+)
 
-def resize_icon(source_path, target_size, target_filename):
-    """Resize an icon to target size"""
+# Distinct pixel sizes, in ICON_SIZES order; each is resized once
+UNIQUE_SIZES = tuple(dict.fromkeys(size for size, _ in ICON_SIZES))
+
+ICON_DIR = "ios/Runner/Assets.xcassets/AppIcon.appiconset"
+
+def link_icon(primary_path, filepath):
+    """Point filepath at an already written icon of the same size"""
+    if os.path.exists(filepath):
+        os.remove(filepath)
+    try:
+        os.link(primary_path, filepath)
+    except OSError:
+        # Filesystems without hard link support get a plain copy
+        shutil.copyfile(primary_path, filepath)
+
+def resize_icon(source_img, target_size, target_filenames):
+    """Resize a decoded icon to target size, save it under each filename and return their status lines"""
+    status = {}
     try:
-        # Open the source image
-        with Image.open(source_path) as img:
-            # Resize with high-quality resampling
-            resized_img = img.resize((target_size, target_size), Image.Resampling.LANCZOS)
-            
-            # Save to target location
-            target_path = f"ios/Runner/Assets.xcassets/AppIcon.appiconset/{target_filename}"
-            resized_img.save(target_path, "PNG")
-            print(f"✅ Created {target_filename} ({target_size}x{target_size})")
-            
+        # Flat block art survives a 2x+ reduction with a cheap box filter;
+        # smaller reductions and upscales keep high-quality LANCZOS
+        if source_img.width / target_size >= 2:
+            resample = Image.Resampling.BOX
+        else:
+            resample = Image.Resampling.LANCZOS
+        resized_img = source_img.resize((target_size, target_size), resample)
+        
+        # Encode in memory and write the bytes out in one call
+        buf = io.BytesIO()
+        resized_img.save(buf, "PNG", optimize=False,
+                         compress_level=1 if target_size < 256 else 6)
+        
+        # Save to target location
+        primary_path = f"{ICON_DIR}/{target_filenames[0]}"
+        # Unlink first so a rewrite never writes through to a skipped icon
+        # that was hard linked to this one by an earlier run
+        if os.path.exists(primary_path):
+            os.remove(primary_path)
+        with open(primary_path, "wb") as f:
+            f.write(buf.getbuffer())
+        status[target_filenames[0]] = f"✅ Created {target_filenames[0]} ({target_size}x{target_size})"
+        
+        # Other icons of the same size hard link to the file just written
+        for target_filename in target_filenames[1:]:
+            link_icon(primary_path, f"{ICON_DIR}/{target_filename}")
+            status[target_filename] = f"🔗 Linked {target_filename} ({target_size}x{target_size})"
+        
     except Exception as e:
-        print(f"❌ Error creating {target_filename}: {e}")
+        for target_filename in target_filenames:
+            status.setdefault(target_filename, f"❌ Error creating {target_filename}: {e}")
+    
+    return status
 
 def main():
     # Use the largest available icon as source (167x167)
@@ -52,15 +93,34 @@ def main():
     
     print("🎨 Generating missing iOS app icons...")
     
-    # Create all missing icon sizes
+    # Decode the source once; every size is resized from this copy
+    with Image.open(source_icon) as img:
+        source_img = img.convert('RGB')
+    
+    # Group the missing icons by pixel size
+    pending = {size: [] for size in UNIQUE_SIZES}
+    status = {}
     for target_size, target_filename in ICON_SIZES:
-        target_path = f"ios/Runner/Assets.xcassets/AppIcon.appiconset/{target_filename}"
+        target_path = f"{ICON_DIR}/{target_filename}"
         
         # Only create if doesn't exist or if we need to fix the size
         if not os.path.exists(target_path) or target_filename == "Icon-App-60x60@2x.png":
-            resize_icon(source_icon, target_size, target_filename)
+            pending[target_size].append(target_filename)
         else:
-            print(f"⏭️  Skipped {target_filename} (already exists)")
+            status[target_filename] = f"⏭️  Skipped {target_filename} (already exists)"
+    
+    # Resize each size once; PIL releases the GIL while resizing and
+    # encoding, so threads run them in parallel
+    sizes = [size for size in UNIQUE_SIZES if pending[size]]
+    with ThreadPoolExecutor() as executor:
+        results = executor.map(functools.partial(resize_icon, source_img),
+                               sizes, [pending[size] for size in sizes])
+        for lines in results:
+            status.update(lines)
+    
+    # Threads finish in any order; report in ICON_SIZES order
+    for _, target_filename in ICON_SIZES:
+        print(status[target_filename])
     
     print("\n🎉 Icon generation complete!")
     print("📱 Ready to build and deploy to iPhone!")